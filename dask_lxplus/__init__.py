@@ -1,11 +1,21 @@
 import logging as _logging
 
 _logger = _logging.getLogger(__name__)
-_logger.setLevel(_logging.DEBUG)
 _logger.addHandler(_logging.NullHandler())
 
-from .cluster import CernCluster
 from .config import _ensure_user_config_file, _set_base_config
 
-_ensure_user_config_file()
-_set_base_config()
\ No newline at end of file
+
+def __getattr__(name):
+    # Defer the config file copy and YAML parse until the cluster class is
+    # actually used, so `import dask_lxplus` stays cheap (PEP 562)
+    if name == "CernCluster":
+        _ensure_user_config_file()
+        _set_base_config()
+        from .cluster import CernCluster
+        globals()["CernCluster"] = CernCluster
+        return CernCluster
+    if name == "cluster":
+        import importlib
+        return importlib.import_module(".cluster", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
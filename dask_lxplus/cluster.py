@@ -1,6 +1,6 @@
+import functools
 import logging
 
-from collections import ChainMap
 import warnings
 import dask
 from dask_jobqueue import HTCondorCluster
@@ -8,14 +8,40 @@ from dask_jobqueue.htcondor import HTCondorJob
 import re
 import sys
 
+from .config import _ensure_user_config_file, _set_base_config
+
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+
+# Compiled once at import time rather than on every call
+_EOS_RE = re.compile(r"^/eos/(?:home|user)(?:-\w+)?(?:/\w)?/(?P<username>\w+)(?P<path>/.+)$")
+_LCG_RE = re.compile(r"^/cvmfs/sft(?:-nightlies)?\.cern\.ch/lcg/.+/python[23]?$")
+
+# Constant pieces appended to every worker's submit options
+_SPOOL_FLAG = "-spool"
+_WORKER_PORT_ARGS = ("--worker-port", "10000:10100")
+
+
+@functools.lru_cache(maxsize=1)
+def _is_lcg_python(executable: str) -> bool:
+    # sys.executable doesn't change over the life of the process, so the
+    # regex only ever needs to run once
+    return bool(_LCG_RE.match(executable))
+
+
+@functools.lru_cache(maxsize=64)
+def _var_re(var):
+    # Cache the compiled pattern per variable name so repeated checks
+    # don't recompile it for every prologue line
+    return re.compile(rf"^\s*export\s+{re.escape(var)}\s*=")
 
 
 def merge(*args):
     # This will merge dicts, but earlier definitions win
-    return dict(ChainMap(*filter(None, args)))
+    out = {}
+    for d in reversed([a for a in args if a]):
+        out.update(d)
+    return out
 
 
 def check_job_script_prologue(var, job_script_prologue):
@@ -36,12 +62,10 @@ def check_job_script_prologue(var, job_script_prologue):
     """
     if not job_script_prologue:
         return False
-    matches = list(filter(lambda x: re.match(f"\W*export {var}\s*=.*", x), job_script_prologue))
-    if matches:
-        return True
-    return False
+    return any(_var_re(var).match(x) for x in job_script_prologue)
 
 
+@functools.lru_cache(maxsize=256)
 def get_xroot_url(eos_path):
     """
     Return the xroot url for a given eos path.
@@ -61,7 +85,9 @@ def get_xroot_url(eos_path):
     # /eos/home-b/bejones/foo/bar
     # /eos/home-io3/b/bejones/foo/bar
     # Also note this only supports eoshome.cern.ch at this point
-    eos_match = re.match("^/eos/(?:home|user)(?:-\w+)?(?:/\w)?/(?P<username>\w+)(?P<path>/.+)$", eos_path)
+    if not eos_path.startswith("/eos/"):
+        return None
+    eos_match = _EOS_RE.match(eos_path)
     if not eos_match:
         return None
     return f"root://eosuser.cern.ch//eos/user/{eos_match.group('username')[:1]}/{eos_match.group('username')}{eos_match.group('path')}"
@@ -81,11 +107,9 @@ class CernJob(HTCondorJob):
             num_cores = base_class_kwargs.get("cores", 1)
             disk = f'{int(num_cores) * 20} GB'
 
-        warnings.simplefilter(action='ignore', category=FutureWarning)
-
-        super().__init__(scheduler=scheduler, name=name, disk=disk, **base_class_kwargs)
-
-        warnings.resetwarnings()
+        with warnings.catch_warnings():
+            warnings.simplefilter(action='ignore', category=FutureWarning)
+            super().__init__(scheduler=scheduler, name=name, disk=disk, **base_class_kwargs)
 
         if hasattr(self, "log_directory"):
                 self.job_header_dict.pop("Stream_Output", None)
@@ -143,6 +167,12 @@ class CernCluster(HTCondorCluster):
         to `dask_jobqueue.HTCondorCluster`.
         """
 
+        # Safety net for callers importing straight from this submodule,
+        # which bypasses the lazy setup in the package __getattr__; both
+        # calls are no-ops after the first
+        _ensure_user_config_file()
+        _set_base_config()
+
         if image_type is not None:
             warnings.warn(
                 "The `image_type` parameter is deprecated. Please use `container_runtime` instead.",
@@ -151,10 +181,10 @@ class CernCluster(HTCondorCluster):
             container_runtime = container_runtime or image_type
 
         if lcg:
-            if not re.match('^/cvmfs/sft(?:-nightlies)?.cern.ch/lcg/.+/python[2,3]?$', sys.executable):
+            if not _is_lcg_python(sys.executable):
                 raise ValueError(f"You need to have loaded the LCG environment before running the python interpreter. Current interpreter: {sys.executable}")
 
-        base_class_kwargs = CernCluster._modify_kwargs(
+        overrides = CernCluster._modify_kwargs(
             base_class_kwargs,
             worker_image=worker_image,
             container_runtime=container_runtime,
@@ -163,11 +193,9 @@ class CernCluster(HTCondorCluster):
             lcg=lcg,
         )
 
-        warnings.simplefilter(action='ignore', category=FutureWarning)
-
-        super().__init__(**base_class_kwargs)
-
-        warnings.resetwarnings()
+        with warnings.catch_warnings():
+            warnings.simplefilter(action='ignore', category=FutureWarning)
+            super().__init__(**{**base_class_kwargs, **overrides})
 
     @classmethod
     def _modify_kwargs(cls,
@@ -182,49 +210,71 @@ class CernCluster(HTCondorCluster):
         """
         This method implements the special modifications to adapt dask-jobqueue to run on the CERN cluster.
 
+        Returns only the keyword overrides to lay over ``kwargs``; the caller
+        merges them rather than this method copying the whole dict.
+
         See the class __init__ for the details of the arguments.
         """
-        modified = kwargs.copy()
+        # No-ops after the first call; needed when this classmethod is used
+        # without going through __init__
+        _ensure_user_config_file()
+        _set_base_config()
+
+        overrides = {}
 
-        container_runtime = container_runtime or dask.config.get(f"jobqueue.{cls.config_name}.container-runtime")
-        worker_image = worker_image or dask.config.get(f"jobqueue.{cls.config_name}.worker-image")
+        # Snapshot the whole config subtree once instead of walking the
+        # nested config dict for every key
+        cfg = dask.config.get(f"jobqueue.{cls.config_name}")
 
-        logdir = modified.get("log_directory", dask.config.get(f"jobqueue.{cls.config_name}.log-directory", None))
+        container_runtime = container_runtime or dask.config.get("container-runtime", config=cfg)
+        worker_image = worker_image or dask.config.get("worker-image", config=cfg)
+
+        logdir = kwargs.get("log_directory", dask.config.get("log-directory", None, config=cfg))
         if logdir:
-            modified["log_directory"] = logdir
-        xroot_url = get_xroot_url(modified["log_directory"]) if logdir and modified["log_directory"].startswith("/eos/") else None
-
-        modified["job_extra_directives"] = merge(
-            {"universe": "docker" if container_runtime == "docker" else "vanilla"},
-            {"docker_image": f'"{worker_image}"'} if container_runtime == "docker" else None,
-            {"MY.SingularityImage": f'"{worker_image}"'} if container_runtime == "singularity" else None,
-            {"request_gpus": str(gpus)} if gpus is not None else None,
-            {"MY.IsDaskWorker": "true"},
-            # getenv justified in case of LCG as both sides have to be the same environment
-            {"getenv": "true"} if lcg else None,
-            {"output_destination": f"{xroot_url}"} if xroot_url else None,
-            {"Output": "worker-$(ClusterId).$(ProcId).out"} if xroot_url else None,
-            {"Error": "worker-$(ClusterId).$(ProcId).err"} if xroot_url else None,
-            {"Log": "worker-$(ClusterId).log"} if xroot_url else None,
-            {"MY.SpoolOnEvict": False} if logdir else None,
-            # extra user input
-            kwargs.get("job_extra_directives", dask.config.get(f"jobqueue.{cls.config_name}.job_extra_directives")),
-            kwargs.get("job_extra", dask.config.get(f"jobqueue.{cls.config_name}.job_extra")),
-            {"JobBatchName": f'"{batch_name or dask.config.get(f"jobqueue.{cls.config_name}.batch-name")}"'},
-            # never transfer files
-            {"transfer_output_files": '""'}
-        )
+            overrides["log_directory"] = logdir
+        # get_xroot_url already returns None for non-EOS paths
+        xroot_url = get_xroot_url(logdir) if logdir else None
+
+        job_extra_directives = {
+            "universe": "docker" if container_runtime == "docker" else "vanilla",
+            "MY.IsDaskWorker": "true",
+        }
+        if container_runtime == "docker":
+            job_extra_directives["docker_image"] = f'"{worker_image}"'
+        elif container_runtime == "singularity":
+            job_extra_directives["MY.SingularityImage"] = f'"{worker_image}"'
+        if gpus is not None:
+            job_extra_directives["request_gpus"] = str(gpus)
+        # getenv justified in case of LCG as both sides have to be the same environment
+        if lcg:
+            job_extra_directives["getenv"] = "true"
+        if xroot_url:
+            job_extra_directives["output_destination"] = xroot_url
+            job_extra_directives["Output"] = "worker-$(ClusterId).$(ProcId).out"
+            job_extra_directives["Error"] = "worker-$(ClusterId).$(ProcId).err"
+            job_extra_directives["Log"] = "worker-$(ClusterId).log"
+        if logdir:
+            job_extra_directives["MY.SpoolOnEvict"] = False
+        # extra user input; setdefault keeps the earlier-definitions-win rule
+        for extra in (
+            kwargs.get("job_extra_directives", dask.config.get("job_extra_directives", config=cfg)),
+            kwargs.get("job_extra", dask.config.get("job_extra", config=cfg)),
+        ):
+            for k, v in (extra or {}).items():
+                job_extra_directives.setdefault(k, v)
+        job_extra_directives.setdefault("JobBatchName", f'"{batch_name or dask.config.get("batch-name", config=cfg)}"')
+        # never transfer files
+        job_extra_directives.setdefault("transfer_output_files", '""')
+        overrides["job_extra_directives"] = job_extra_directives
 
         submit_command_extra = kwargs.get("submit_command_extra", [])
-        if "-spool" not in submit_command_extra:
-            submit_command_extra.append('-spool')
-            modified["submit_command_extra"] = submit_command_extra
-
-        modified["worker_extra_args"] = [
-                *kwargs.get("worker_extra_args", dask.config.get(f"jobqueue.{cls.config_name}.worker_extra_args")),
-            "--worker-port",
-            "10000:10100",
+        if _SPOOL_FLAG not in submit_command_extra:
+            overrides["submit_command_extra"] = [*submit_command_extra, _SPOOL_FLAG]
+
+        overrides["worker_extra_args"] = [
+            *kwargs.get("worker_extra_args", dask.config.get("worker_extra_args", config=cfg)),
+            *_WORKER_PORT_ARGS,
         ]
-        return modified
+        return overrides
 
 
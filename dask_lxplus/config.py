@@ -1,20 +1,41 @@
+import copy
+from functools import lru_cache
 from pathlib import Path
 
 import dask
 import yaml
 
+try:
+    # LibYAML's C parser, much faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 PYPKG_DIR = Path(__file__).parent
 CONFIG_FILE = "jobqueue-cern.yaml"
 PKG_CONFIG_FILE = PYPKG_DIR / CONFIG_FILE
 
+@lru_cache(maxsize=1)
+def _load_defaults():
+    with open(PKG_CONFIG_FILE) as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
 def _ensure_user_config_file():
-    dask.config.ensure_file(source=PKG_CONFIG_FILE)
+    # ensure_file re-reads the packaged YAML on every call; skip it entirely
+    # once the user copy exists
+    if not _user_config_file_path().exists():
+        dask.config.ensure_file(source=PKG_CONFIG_FILE)
 
-def _set_base_config(priority: str = "old"):
-    with open(PKG_CONFIG_FILE) as f:
-        defaults = yaml.safe_load(f)
+_base_config_applied = False
 
-    dask.config.update(dask.config.config, defaults,priority=priority)
+def _set_base_config(priority: str = "old"):
+    # Apply the defaults once per process; hand dask its own copy so later
+    # dask.config.set calls can't mutate the cached dict
+    global _base_config_applied
+    if _base_config_applied:
+        return
+    dask.config.update(dask.config.config, copy.deepcopy(_load_defaults()), priority=priority)
+    _base_config_applied = True
 
 def _user_config_file_path() -> Path:
-    return Path(dask.config.PATH) / CONFIG_FILE
\ No newline at end of file
+    return Path(dask.config.PATH) / CONFIG_FILE
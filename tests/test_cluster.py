@@ -18,6 +18,7 @@ class TestCluster(TestCase):
         self.assertTrue(check_job_script_prologue("PYTHONHOME", job_script_prologue))
         self.assertTrue(check_job_script_prologue("LD_LIBRARY_PATH", job_script_prologue))
         self.assertFalse(check_job_script_prologue("PATH", job_script_prologue))
+        self.assertFalse(check_job_script_prologue("PATH", ["export MYPATH=/x"]))
 
     def test_xroot_url(self):
         for p in ["/eos/user/b/bejones/SWAN_projects", "/eos/home-b/bejones/SWAN_projects", "/eos/home-io3/b/bejones/SWAN_projects"]: